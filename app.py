@@ -1,35 +1,108 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, has_request_context, request, jsonify, stream_with_context
+from flask.json.provider import JSONProvider
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import Engine
 import hashlib
-from collections import Counter
+import orjson
 import os
+import re
+import sqlite3
+
+from utils import analyze_string
 
 # ----------------------------
 # App setup
 # ----------------------------
+class ORJSONProvider(JSONProvider):
+    # orjson for request bodies (get_json) and jsonify responses alike
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
 
 # Ensure instance folder exists
 os.makedirs(os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance"), exist_ok=True)
 
 # Database config
 db_path = os.path.join(os.path.abspath(os.path.dirname(__file__)), "instance", "app.db")
-app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{db_path}"
+app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///file:{db_path}?mode=rwc&uri=true"
+# Read-only connections to the same file, used for GET requests
+app.config["SQLALCHEMY_BINDS"] = {"readonly": f"sqlite:///file:{db_path}?mode=ro&uri=true"}
+app.config["SQLALCHEMY_ENGINE_OPTIONS"] = {
+    "pool_size": 16,
+    "max_overflow": 32,
+    "connect_args": {"check_same_thread": False},
+}
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
-db = SQLAlchemy(app)
+
+class RoutingSession(Session):
+    # GET requests never write, so their queries go to the read-only pool and
+    # don't compete with writers for the read-write connections
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and not self._flushing and has_request_context() and request.method == "GET":
+            return self._db.engines["readonly"]
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+db = SQLAlchemy(app, session_options={"class_": RoutingSession})
+
+# WAL lets readers run alongside a writer and makes commits cheaper; mmap and
+# a larger page cache serve reads straight from the OS page cache
+@event.listens_for(Engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    if not isinstance(dbapi_connection, sqlite3.Connection):
+        return
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA mmap_size=268435456")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
 
 # ----------------------------
 # Model
 # ----------------------------
+class RawJSON(db.TypeDecorator):
+    # JSON kept as text: dicts are encoded on the way in, and reads return the
+    # stored JSON string untouched so responses can splice it in as-is
+    impl = db.Text
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, str):
+            return value
+        return orjson.dumps(value).decode()
+
 class AnalyzedString(db.Model):
+    __table_args__ = (
+        # Cover the list filters plus the columns the page lookup reads (id is
+        # the rowid): one for is_palindrome (with or without a length range),
+        # one for length ranges on their own
+        db.Index("ix_analyzed_string_is_palindrome_length", "is_palindrome", "length", "sha256_hash"),
+        db.Index("ix_analyzed_string_length", "length", "sha256_hash"),
+        # Never reuse the id of a deleted row; ETags rely on (id, hash) pairs
+        {"sqlite_autoincrement": True},
+    )
+
     id = db.Column(db.Integer, primary_key=True)
     value = db.Column(db.Text, unique=True, nullable=False)
+    # Derived columns are filled in by analyze_string rather than generated by
+    # SQLite: they describe value.strip() (Python whitespace rules, which
+    # SQLite's trim() doesn't match) and SQLite has no built-in sha256()
     length = db.Column(db.Integer)
     is_palindrome = db.Column(db.Boolean)
     unique_characters = db.Column(db.Integer)
     word_count = db.Column(db.Integer)
-    sha256_hash = db.Column(db.String(64))
-    character_frequency_map = db.Column(db.JSON)
+    # Raw 32-byte digest (half the size of the hex form), indexed for lookups by content
+    sha256_hash = db.Column(db.LargeBinary(32), index=True)
+    character_frequency_map = db.Column(RawJSON)
 
     def to_dict(self):
         return {
@@ -39,27 +112,119 @@ class AnalyzedString(db.Model):
             "is_palindrome": self.is_palindrome,
             "unique_characters": self.unique_characters,
             "word_count": self.word_count,
-            "sha256_hash": self.sha256_hash,
-            "character_frequency_map": self.character_frequency_map,
+            "sha256_hash": self.sha256_hash.hex() if self.sha256_hash is not None else None,
+            "character_frequency_map": (
+                orjson.Fragment(self.character_frequency_map)
+                if self.character_frequency_map is not None
+                else None
+            ),
         }
 
+def upgrade_legacy_schema():
+    # Idempotent upgrade for databases created by earlier versions: the table
+    # lacked AUTOINCREMENT, sha256_hash used to hold the hex digest as text,
+    # and create_all() never adds new indexes to a table that already exists
+    table = AnalyzedString.__table__
+    with db.engine.begin() as connection:
+        table_sql = connection.execute(db.text(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = :name"
+        ), {"name": table.name}).scalar()
+        if "AUTOINCREMENT" not in table_sql.upper():
+            # SQLite can't add AUTOINCREMENT in place, so rebuild the table.
+            # Its indexes follow the rename; drop them so the new table can
+            # reuse their names.
+            connection.execute(db.text(f"ALTER TABLE {table.name} RENAME TO {table.name}_legacy"))
+            legacy_indexes = connection.execute(db.text(
+                "SELECT name FROM sqlite_master WHERE type = 'index' AND tbl_name = :name AND sql IS NOT NULL"
+            ), {"name": f"{table.name}_legacy"}).scalars().all()
+            for name in legacy_indexes:
+                connection.execute(db.text(f'DROP INDEX "{name}"'))
+            table.create(connection)
+            columns = ", ".join(column.name for column in table.columns)
+            connection.execute(db.text(
+                f"INSERT INTO {table.name} ({columns}) SELECT {columns} FROM {table.name}_legacy"
+            ))
+            connection.execute(db.text(f"DROP TABLE {table.name}_legacy"))
+
+        legacy = connection.execute(db.text(
+            "SELECT id, sha256_hash FROM analyzed_string WHERE typeof(sha256_hash) = 'text'"
+        )).all()
+        if legacy:
+            connection.execute(
+                db.text("UPDATE analyzed_string SET sha256_hash = :digest WHERE id = :id"),
+                [{"id": row_id, "digest": bytes.fromhex(hex_hash)} for row_id, hex_hash in legacy],
+            )
+        for index in table.indexes:
+            index.create(connection, checkfirst=True)
+
 # Create DB tables
 with app.app_context():
     db.create_all()
+    upgrade_legacy_schema()
 
 # ----------------------------
 # Helper function
 # ----------------------------
-def analyze_string(text):
-    clean_text = text.strip()
-    return {
-        "length": len(clean_text),
-        "is_palindrome": clean_text.lower() == clean_text[::-1].lower(),
-        "unique_characters": len(set(clean_text)),
-        "word_count": len(clean_text.split()),
-        "sha256_hash": hashlib.sha256(clean_text.encode()).hexdigest(),
-        "character_frequency_map": dict(Counter(clean_text)),
-    }
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+# SQLite integers are signed 64-bit
+MAX_OFFSET = 2**63 - 1
+
+def rows_etag(rows):
+    # Ids are never reused (AUTOINCREMENT) and a row is never updated, so the
+    # id alone identifies a row's content; the hash is folded in as well
+    digest = hashlib.sha256()
+    for row_id, sha256_hash in rows:
+        digest.update(row_id.to_bytes(8, "big"))
+        digest.update(sha256_hash)
+    return digest.hexdigest()
+
+def not_modified(etag):
+    response = Response(status=304)
+    response.set_etag(etag)
+    return response
+
+def json_list_response(query, batch_size=500):
+    limit = min(max(request.args.get("limit", DEFAULT_PAGE_SIZE, type=int), 0), MAX_PAGE_SIZE)
+    offset = min(max(request.args.get("offset", 0, type=int), 0), MAX_OFFSET)
+
+    # Select the page from a covering index when the filters allow it; the
+    # (id, hash) pairs are also all the ETag needs, so clients with a fresh
+    # copy get a 304 without any full row being loaded or encoded
+    page = (
+        query.with_entities(AnalyzedString.id, AnalyzedString.sha256_hash)
+        .order_by(AnalyzedString.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    etag = rows_etag(page)
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+
+    # Then hydrate only the rows on this page by primary key
+    query = AnalyzedString.query.filter(
+        AnalyzedString.id.in_([row_id for row_id, _ in page])
+    ).order_by(AnalyzedString.id)
+
+    # Stream rows as a JSON array in batches instead of materializing the
+    # whole result set and encoding it in one go
+    def generate():
+        yield b"["
+        batch = []
+        first = True
+        for s in query.yield_per(batch_size):
+            batch.append(orjson.dumps(s.to_dict()))
+            if len(batch) == batch_size:
+                yield (b"" if first else b",") + b",".join(batch)
+                batch, first = [], False
+        if batch:
+            yield (b"" if first else b",") + b",".join(batch)
+        yield b"]"
+
+    response = Response(stream_with_context(generate()), mimetype="application/json")
+    response.set_etag(etag)
+    return response
 
 # ----------------------------
 # Routes
@@ -87,8 +252,8 @@ def list_create_strings():
 
         value = data["value"]
 
-        # Check duplicate
-        if AnalyzedString.query.filter_by(value=value).first():
+        # Check duplicate; only the id is fetched, via the unique index on value
+        if db.session.query(AnalyzedString.id).filter_by(value=value).first() is not None:
             return jsonify({"error": "String already analyzed"}), 409
 
         analysis = analyze_string(value)
@@ -113,8 +278,57 @@ def list_create_strings():
         is_pal = is_palindrome.lower() == "true"
         query = query.filter(AnalyzedString.is_palindrome == is_pal)
 
-    results = [s.to_dict() for s in query.all()]
-    return jsonify(results), 200
+    return json_list_response(query)
+
+# POST /strings/bulk
+@app.route("/strings/bulk", methods=["POST"])
+def bulk_create_strings():
+    values = request.get_json()
+    if not isinstance(values, list) or not all(isinstance(v, str) for v in values):
+        return jsonify({"error": "Expected a JSON array of strings"}), 422
+
+    # Skip values already stored, and repeats within the same batch
+    existing = {
+        row.value
+        for row in db.session.query(AnalyzedString.value).filter(AnalyzedString.value.in_(values))
+    }
+    rows = []
+    for value in values:
+        if value in existing:
+            continue
+        existing.add(value)
+        rows.append({"value": value, **analyze_string(value)})
+
+    # One executemany INSERT and a single commit for the whole batch; rows that
+    # lost a race with a concurrent insert are skipped by ON CONFLICT
+    created = []
+    if rows:
+        stmt = (
+            sqlite_insert(AnalyzedString)
+            .on_conflict_do_nothing(index_elements=["value"])
+            .returning(AnalyzedString)
+        )
+        created = db.session.scalars(stmt, rows).all()
+
+    # Serialize before committing: the commit expires the returned objects, and
+    # touching them afterwards would reload each row with its own SELECT
+    created_dicts = [s.to_dict() for s in created]
+    inserted = {s.value for s in created}
+    db.session.commit()
+
+    # Anything RETURNING didn't hand back was already stored, repeated in the
+    # batch, or inserted concurrently by another request
+    duplicates = []
+    for value in values:
+        if value in inserted:
+            inserted.discard(value)
+        else:
+            duplicates.append(value)
+
+    return jsonify({
+        "created": created_dicts,
+        "duplicates": duplicates,
+    }), 201
 
 # GET single string
 @app.route("/strings/<string:value>/", methods=["GET"])
@@ -122,7 +336,13 @@ def get_string(value):
     string_obj = AnalyzedString.query.filter_by(value=value).first()
     if not string_obj:
         return jsonify({"error": "String not found"}), 404
-    return jsonify(string_obj.to_dict()), 200
+
+    etag = rows_etag([(string_obj.id, string_obj.sha256_hash)])
+    if request.if_none_match.contains_weak(etag):
+        return not_modified(etag)
+    response = jsonify(string_obj.to_dict())
+    response.set_etag(etag)
+    return response, 200
 
 # DELETE string
 @app.route("/strings/<string:value>/delete/", methods=["DELETE"])
@@ -135,28 +355,37 @@ def delete_string(value):
     return jsonify({"message": "Deleted successfully"}), 200
 
 # GET /strings/filter-by-natural-language
+# Compiled once: a single scan finds every supported phrase, and the token
+# following "longer than"/"shorter than" is captured (without consuming it)
+# as its number
+NATURAL_LANGUAGE_PATTERN = re.compile(
+    r"palindrome|(?P<phrase>longer|shorter) than(?=\s*(?P<number>\S*))"
+)
+
 @app.route("/strings/filter-by-natural-language", methods=["GET"])
 def filter_natural_language():
     query_text = request.args.get("query", "").lower()
     query = AnalyzedString.query
 
-    if "palindrome" in query_text:
+    # Only the first occurrence of each phrase counts
+    matches = {}
+    for match in NATURAL_LANGUAGE_PATTERN.finditer(query_text):
+        matches.setdefault(match.group("phrase") or match.group(), match.group("number"))
+
+    if "palindrome" in matches:
         query = query.filter(AnalyzedString.is_palindrome == True)
-    if "longer than" in query_text:
+    if "longer" in matches:
         try:
-            n = int(query_text.split("longer than")[1].split()[0])
-            query = query.filter(AnalyzedString.length > n)
-        except:
+            query = query.filter(AnalyzedString.length > int(matches["longer"]))
+        except ValueError:
             pass
-    if "shorter than" in query_text:
+    if "shorter" in matches:
         try:
-            n = int(query_text.split("shorter than")[1].split()[0])
-            query = query.filter(AnalyzedString.length < n)
-        except:
+            query = query.filter(AnalyzedString.length < int(matches["shorter"]))
+        except ValueError:
             pass
 
-    results = [s.to_dict() for s in query.all()]
-    return jsonify(results), 200
+    return json_list_response(query)
 
 # ----------------------------
 # Run app